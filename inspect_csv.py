@@ -1,7 +1,8 @@
 import pandas as pd
 
 # Load your CSV
-df = pd.read_csv("apt_tickets_complete_cleaned.csv")
+# (C parser: Jira free-text fields can hold quoted newlines)
+df = pd.read_csv("apt_tickets_complete_cleaned.csv", dtype_backend="pyarrow")
 
 print("\n✅ CSV successfully loaded!\n")
 
@@ -25,6 +26,6 @@ print("\n───────────────────────
 
 # Quick text length overview if there’s a 'Description' or 'Resolution' column
 if 'Description' in df.columns:
-    print("📝 Average description length:", df['Description'].fillna('').apply(len).mean())
+    print("📝 Average description length:", df['Description'].fillna('').str.len().mean())
 if 'Resolution' in df.columns:
-    print("🧠 Average resolution length:", df['Resolution'].fillna('').apply(len).mean())
+    print("🧠 Average resolution length:", df['Resolution'].fillna('').str.len().mean())
@@ -0,0 +1,20 @@
+from sentence_transformers import SentenceTransformer, export_dynamic_quantized_onnx_model
+from rag_models import EMBEDDING_MODEL, ENCODER_INT8_DIR, ENCODER_INT8_FILE
+import os
+
+# ────────────────────────────────────────────────
+# Step 1 — Export the embedding model to ONNX
+# ────────────────────────────────────────────────
+print(f"🔄 Exporting {EMBEDDING_MODEL} to ONNX...")
+model = SentenceTransformer(EMBEDDING_MODEL, backend="onnx")
+os.makedirs(ENCODER_INT8_DIR, exist_ok=True)
+model.save(ENCODER_INT8_DIR)
+
+# ────────────────────────────────────────────────
+# Step 2 — Dynamic INT8 quantization
+# ────────────────────────────────────────────────
+print("\n⚙️ Quantizing encoder weights to INT8...")
+export_dynamic_quantized_onnx_model(model, "avx512_vnni", ENCODER_INT8_DIR)
+
+print(f"\n✅ Quantized encoder saved → {os.path.join(ENCODER_INT8_DIR, ENCODER_INT8_FILE)}")
+print("All indexing and query scripts will now load it automatically.")
@@ -0,0 +1,32 @@
+from optimum.onnxruntime import ORTModelForSeq2SeqLM, ORTOptimizer, ORTQuantizer
+from optimum.onnxruntime.configuration import AutoOptimizationConfig, AutoQuantizationConfig
+from transformers import AutoTokenizer
+from rag_models import LLM_MODEL, GENERATOR_ONNX_DIR
+import os
+
+# ────────────────────────────────────────────────
+# Step 1 — Export flan-T5 to ONNX with past key/values
+# ────────────────────────────────────────────────
+print(f"🔄 Exporting {LLM_MODEL} to ONNX (with KV cache)...")
+model = ORTModelForSeq2SeqLM.from_pretrained(LLM_MODEL, export=True, use_cache=True)
+
+# ────────────────────────────────────────────────
+# Step 2 — Graph optimization (operator fusion)
+# ────────────────────────────────────────────────
+print("\n⚙️ Optimizing ONNX graphs (O3)...")
+os.makedirs(GENERATOR_ONNX_DIR, exist_ok=True)
+optimizer = ORTOptimizer.from_pretrained(model)
+optimizer.optimize(save_dir=GENERATOR_ONNX_DIR, optimization_config=AutoOptimizationConfig.O3())
+AutoTokenizer.from_pretrained(LLM_MODEL).save_pretrained(GENERATOR_ONNX_DIR)
+
+# ────────────────────────────────────────────────
+# Step 3 — Dynamic INT8 quantization of each graph
+# ────────────────────────────────────────────────
+print("\n⚙️ Quantizing encoder / decoder weights to INT8...")
+quantization_config = AutoQuantizationConfig.avx512_vnni(is_static=False, per_channel=False)
+for onnx_file in ["encoder_model_optimized.onnx", "decoder_model_optimized.onnx", "decoder_with_past_model_optimized.onnx"]:
+    quantizer = ORTQuantizer.from_pretrained(GENERATOR_ONNX_DIR, file_name=onnx_file)
+    quantizer.quantize(save_dir=GENERATOR_ONNX_DIR, quantization_config=quantization_config)
+
+print(f"\n✅ Optimized INT8 generator saved → {GENERATOR_ONNX_DIR}")
+print("step4_generate_insights.py and rag_generate.py will now load it automatically.")
@@ -1,47 +1,58 @@
-from sentence_transformers import SentenceTransformer
-from transformers import AutoTokenizer, AutoModelForSeq2SeqLM
-import faiss
+from rag_models import load_encoder, load_generator, load_index
 import pandas as pd
 import numpy as np
+import torch
 import time
 
 # Small delay so VS Code terminal handles input() cleanly
 time.sleep(1)
 
 # Step 1: Load FAISS index and dataset
-index = faiss.read_index("data/rag_index.faiss")
-df = pd.read_csv("data/rag_docs.csv")
+index = load_index("data/rag_index.faiss")
+df = pd.read_csv("data/rag_docs.csv", usecols=["text"], dtype_backend="pyarrow")
 
 # Step 2: Load embedding and generation models
-embedder = SentenceTransformer('all-MiniLM-L6-v2')
-tokenizer = AutoTokenizer.from_pretrained("google/flan-t5-base")
-generator = AutoModelForSeq2SeqLM.from_pretrained("google/flan-t5-base")
+embedder = load_encoder()
+tokenizer, generator = load_generator()
 
 # Step 3: Ask your analytical question
 query = input("\nAsk your analytical question: ")
 
 # Step 4: Encode and search for top matches
-query_vector = embedder.encode([query])
+query_vector = embedder.encode([query], convert_to_numpy=True, normalize_embeddings=True)  # matches rag_index.py
 k = 3  # you can raise this to 5 for more context
-D, I = index.search(np.array(query_vector, dtype=np.float32), k)
+D, I = index.search(np.ascontiguousarray(query_vector, dtype=np.float32), k)
 
 # Step 5: Safely build the context from retrieved text
-context_parts = []
-for idx in I[0]:
-    if pd.notnull(df.iloc[idx]['text']):
-        context_parts.append(str(df.iloc[idx]['text']))
-context = " ".join(context_parts)
-
-# Step 6: Build the analytical prompt
-prompt = (
-    f"Based on the following incident data: {context}\n\n"
-    f"Explain the key factors that impact MTTR and summarize any patterns or root causes. "
-    f"Answer in an analytical tone."
+# (one gather for all hits; FAISS pads missing neighbours with -1)
+texts = df["text"].to_numpy()
+retrieved = texts[I[0][I[0] >= 0]]
+context = " ".join(str(text) for text in retrieved if pd.notnull(text))
+
+# Step 6: Build the analytical prompt from pre-tokenized fixed text, so only
+# the retrieved context goes through the tokenizer and gets truncated
+prefix_ids = tokenizer("Based on the following incident data: ", add_special_tokens=False).input_ids
+suffix_ids = tokenizer(
+    "\n\nExplain the key factors that impact MTTR and summarize any patterns or root causes. "
+    "Answer in an analytical tone.",
+    add_special_tokens=False,
+).input_ids
+context_budget = tokenizer.model_max_length - len(prefix_ids) - len(suffix_ids) - 1  # room for </s>
+context_ids = tokenizer(context, add_special_tokens=False).input_ids[:context_budget]
+input_ids = torch.tensor(
+    [prefix_ids + context_ids + suffix_ids + [tokenizer.eos_token_id]], device=generator.device
 )
 
 # Step 7: Generate analytical insight
-inputs = tokenizer(prompt, return_tensors="pt")
-outputs = generator.generate(**inputs, max_length=400)
+with torch.inference_mode():
+    outputs = generator.generate(
+        input_ids=input_ids,
+        attention_mask=torch.ones_like(input_ids),
+        max_new_tokens=128,
+        num_beams=1,
+        do_sample=False,
+        use_cache=True,
+    )
 answer = tokenizer.decode(outputs[0], skip_special_tokens=True)
 
 # Step 8: Display results
@@ -1,4 +1,4 @@
-from sentence_transformers import SentenceTransformer
+from rag_models import load_encoder
 import faiss
 import pandas as pd
 import numpy as np
@@ -7,13 +7,14 @@ import numpy as np
 df = pd.read_csv("data/sample_docs.csv")
 
 # Load embedding model
-model = SentenceTransformer('all-MiniLM-L6-v2')
+model = load_encoder()
 
-# Encode text
-embeddings = model.encode(df["text"].tolist(), show_progress_bar=True)
+# Encode text (unit-length, so inner product is cosine similarity)
+embeddings = model.encode(df["text"].tolist(), show_progress_bar=True, normalize_embeddings=True)
 
-# Convert to FAISS index
-index = faiss.IndexFlatL2(embeddings.shape[1])
+# Convert to FAISS HNSW index (graph search instead of a full scan)
+index = faiss.IndexHNSWFlat(embeddings.shape[1], 32, faiss.METRIC_INNER_PRODUCT)
+index.hnsw.efConstruction = 200
 index.add(np.array(embeddings, dtype=np.float32))
 
 # Save index and mapping
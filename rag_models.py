@@ -0,0 +1,143 @@
+import atexit
+import gc
+import os
+from functools import lru_cache
+
+import faiss
+import numpy as np
+import torch
+from sentence_transformers import SentenceTransformer
+from transformers import AutoTokenizer, AutoModelForSeq2SeqLM
+
+# Shared model and index loaders for the indexing and query scripts.
+EMBEDDING_MODEL = "all-MiniLM-L6-v2"
+LLM_MODEL = "google/flan-t5-base"
+
+DEVICE = "cuda" if torch.cuda.is_available() else "cpu"
+
+# PyTorch's default CPU thread count can leave cores idle during encode/generate
+if DEVICE == "cpu":
+    torch.set_num_threads(os.cpu_count() or 4)
+    try:
+        torch.set_num_interop_threads(2)
+    except RuntimeError:  # only settable before any inter-op work has started
+        pass
+torch.backends.mkldnn.enabled = True
+
+# Written by optimize_encoder.py (ONNX export + dynamic INT8 quantization)
+ENCODER_INT8_DIR = "data/encoder_int8"
+ENCODER_INT8_FILE = "onnx/model_qint8_avx512_vnni.onnx"
+
+# Written by optimize_generator.py (ONNX export with KV cache + graph optimization,
+# then dynamic INT8 quantization of each graph)
+GENERATOR_ONNX_DIR = "data/flan-t5-base-onnx"
+GENERATOR_INT8_FILES = {
+    "encoder_file_name": "encoder_model_optimized_quantized.onnx",
+    "decoder_file_name": "decoder_model_optimized_quantized.onnx",
+    "decoder_with_past_file_name": "decoder_with_past_model_optimized_quantized.onnx",
+}
+
+
+def encoder_variant():
+    """Which weights load_encoder() serves; part of the embedding cache key."""
+    if DEVICE == "cpu" and os.path.exists(os.path.join(ENCODER_INT8_DIR, ENCODER_INT8_FILE)):
+        return ENCODER_INT8_FILE
+    return "float16-cuda" if DEVICE == "cuda" else "float32-cpu"
+
+
+@lru_cache(maxsize=None)
+def load_encoder():
+    """Return the encoder: float16 PyTorch on GPU, else the INT8 ONNX export if present."""
+    if encoder_variant() == ENCODER_INT8_FILE:
+        return SentenceTransformer(
+            ENCODER_INT8_DIR, backend="onnx", model_kwargs={"file_name": ENCODER_INT8_FILE}
+        )
+    encoder = SentenceTransformer(EMBEDDING_MODEL, device=DEVICE)
+    if DEVICE == "cuda":
+        # MiniLM is fine in float16 (unlike T5); callers cast to float32 for FAISS
+        encoder.half()
+    return encoder
+
+
+def generator_variant():
+    """Which weights load_generator() serves; part of the answer cache key."""
+    if DEVICE == "cuda":
+        return "bfloat16-cuda" if torch.cuda.is_bf16_supported() else "float16-cuda"
+    if os.path.isdir(GENERATOR_ONNX_DIR):
+        if all(os.path.exists(os.path.join(GENERATOR_ONNX_DIR, f)) for f in GENERATOR_INT8_FILES.values()):
+            return "int8-onnx"
+        return "onnx"
+    return "float32-cpu"
+
+
+@lru_cache(maxsize=None)
+def load_tokenizer():
+    """The generator's tokenizer alone, without loading the model weights."""
+    if DEVICE == "cpu" and os.path.isdir(GENERATOR_ONNX_DIR):
+        return AutoTokenizer.from_pretrained(GENERATOR_ONNX_DIR)
+    return AutoTokenizer.from_pretrained(LLM_MODEL)
+
+
+@lru_cache(maxsize=None)
+def load_generator():
+    """Return (tokenizer, generator): half precision on GPU, else the ONNX export if present."""
+    variant = generator_variant()
+    if DEVICE == "cuda":
+        # T5 overflows more easily in float16, so prefer bfloat16 where supported
+        dtype = torch.bfloat16 if variant == "bfloat16-cuda" else torch.float16
+        generator = AutoModelForSeq2SeqLM.from_pretrained(LLM_MODEL, torch_dtype=dtype).to(DEVICE)
+        return load_tokenizer(), generator
+    if variant in ("onnx", "int8-onnx"):
+        import onnxruntime
+        from optimum.onnxruntime import ORTModelForSeq2SeqLM
+
+        session_options = onnxruntime.SessionOptions()
+        session_options.intra_op_num_threads = os.cpu_count() or 4
+        int8_files = GENERATOR_INT8_FILES if variant == "int8-onnx" else {}
+
+        generator = ORTModelForSeq2SeqLM.from_pretrained(
+            GENERATOR_ONNX_DIR,
+            use_cache=True,
+            provider="CPUExecutionProvider",
+            session_options=session_options,
+            **int8_files,
+        )
+        return load_tokenizer(), generator
+    return load_tokenizer(), AutoModelForSeq2SeqLM.from_pretrained(LLM_MODEL)
+
+
+def load_index(path, nprobe=16):
+    """Open a FAISS index read-only and memory-mapped, with this repo's search settings."""
+    # With IO_FLAG_MMAP only IVF inverted lists stay on disk and are paged in as
+    # probed; the coarse quantizer, HNSW graph and flat codes are read in full
+    index = faiss.read_index(path, faiss.IO_FLAG_MMAP | faiss.IO_FLAG_READ_ONLY)
+    if isinstance(index, faiss.IndexFlat):
+        # Exhaustive scan of every vector per query; fine for a few thousand tickets only
+        print(f"⚠️ {path} is a flat index. Rebuild it as an HNSW or IVF-PQ index.")
+    if hasattr(index, "hnsw"):
+        index.hnsw.efSearch = 64  # recall / speed trade-off for HNSW indexes
+    ivf = faiss.try_extract_index_ivf(index)
+    if ivf is not None:
+        ivf.nprobe = nprobe  # IVF cells probed per query for OPQ+IVF+PQ indexes
+        # FAISS GPUs handle IVF indexes (not HNSW); the clone keeps nprobe
+        if faiss.get_num_gpus() > 0:
+            index = faiss.index_cpu_to_all_gpus(index)
+        # A throwaway search pages in the nprobe inverted lists nearest the
+        # origin (and on GPU, sets up the device); nothing else is mapped lazily
+        index.search(np.zeros((1, index.d), dtype=np.float32), 1)
+    return index
+
+
+def release_models():
+    """Drop the cached encoder and generator, e.g. between scripted runs in one process."""
+    load_encoder.cache_clear()
+    load_generator.cache_clear()
+    load_tokenizer.cache_clear()
+    gc.collect()
+    if DEVICE == "cuda":
+        torch.cuda.empty_cache()  # hand the freed blocks back from torch's caching allocator
+
+
+# Also runs at interpreter exit, so CUDA memory is handed back even when a
+# script never calls it explicitly
+atexit.register(release_models)
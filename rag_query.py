@@ -1,21 +1,21 @@
-from sentence_transformers import SentenceTransformer
-import faiss
+from rag_models import load_encoder, load_index
 import pandas as pd
 import numpy as np
 
 # Load index and documents
-index = faiss.read_index("data/rag_index.faiss")
-df = pd.read_csv("data/rag_docs.csv")
-model = SentenceTransformer('all-MiniLM-L6-v2')
+index = load_index("data/rag_index.faiss")
+df = pd.read_csv("data/rag_docs.csv", usecols=["text"], dtype_backend="pyarrow")
+texts = df["text"].to_numpy()
+model = load_encoder()
 
 # User query
 query = "How can I speed up incident resolution in ServiceNow?"
-query_vector = model.encode([query])
+query_vector = model.encode([query], convert_to_numpy=True, normalize_embeddings=True)  # matches rag_index.py
 
 # Search
 k = 2  # top 2 matches
-D, I = index.search(np.array(query_vector, dtype=np.float32), k)
+D, I = index.search(np.ascontiguousarray(query_vector, dtype=np.float32), k)
 
 print("\n🔎 Query:", query)
-for idx in I[0]:
-    print(f"Match: {df.iloc[idx]['text']}")
+for text in texts[I[0][I[0] >= 0]]:  # one gather; FAISS pads missing neighbours with -1
+    print(f"Match: {text}")
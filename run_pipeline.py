@@ -0,0 +1,63 @@
+import argparse
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from rag_models import load_encoder
+from step1_inspect_csv import main as inspect_csv
+from step2_prepare_text import main as prepare_text
+from step5_clean_descriptions import main as clean_descriptions
+from step3_build_index import main as build_index
+from step4_generate_insights import main as generate_insights, release_insight_models
+
+
+class PipelineRunner:
+    """Run the pipeline steps without starting a fresh interpreter per step.
+
+    The data-prep steps only read the raw CSV, so they run side by side in
+    worker processes while this process loads the embedding model. The index
+    and insight steps then run here and reuse that model (see
+    rag_models.load_encoder).
+    """
+
+    def __init__(self, query=None, skip_insights=False):
+        self.query = query
+        self.prep_steps = [
+            ("Inspect raw CSV", inspect_csv),
+            ("Prepare ticket text", prepare_text),
+            ("Clean ticket descriptions", clean_descriptions),
+        ]
+        self.steps = [("Build FAISS index", build_index)]
+        if not skip_insights:
+            insight_args = ["--query", query] if query else []
+            self.steps.append(("Generate insight", lambda: generate_insights(insight_args)))
+            # Last step: hand the encoder/generator memory back before returning to the caller
+            self.steps.append(("Release models", release_insight_models))
+
+    def run_step(self, name, step):
+        print(f"\n════════ {name} ════════\n")
+        start = time.perf_counter()
+        step()
+        print(f"\n⏱️ {name} finished in {time.perf_counter() - start:.1f}s")
+
+    def run_prep_steps(self):
+        with ProcessPoolExecutor(max_workers=2) as pool:
+            futures = {pool.submit(step): name for name, step in self.prep_steps}
+            self.run_step("Load embedding model", load_encoder)
+            for future in as_completed(futures):
+                future.result()  # re-raises a failed step here
+                print(f"✅ {futures[future]} done")
+
+    def run(self):
+        start = time.perf_counter()
+        self.run_prep_steps()
+        for name, step in self.steps:
+            self.run_step(name, step)
+        print(f"\n✅ Pipeline finished in {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the Jira RAG pipeline end to end.")
+    parser.add_argument("--query", help="question for the insight step (prompted for when omitted)")
+    parser.add_argument("--skip-insights", action="store_true", help="stop after building the index")
+    args = parser.parse_args()
+    PipelineRunner(query=args.query, skip_insights=args.skip_insights).run()
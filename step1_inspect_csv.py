@@ -1,12 +1,18 @@
 import pandas as pd
 
-# Load your CSV
-df = pd.read_csv("apt_tickets_complete_cleaned.csv")
 
-# Show basic info
-print("\n✅ CSV successfully loaded!\n")
-print("📊 Columns in your file:")
-print(df.columns.tolist())
+def main():
+    # Load your CSV (only the preview rows are needed)
+    df = pd.read_csv("apt_tickets_complete_cleaned.csv", nrows=5)
 
-print("\n🧩 First 5 rows:")
-print(df.head(5))
+    # Show basic info
+    print("\n✅ CSV successfully loaded!\n")
+    print("📊 Columns in your file:")
+    print(df.columns.tolist())
+
+    print("\n🧩 First 5 rows:")
+    print(df.head(5))
+
+
+if __name__ == "__main__":
+    main()
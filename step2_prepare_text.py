@@ -1,28 +1,52 @@
 import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
 
-# Load your Jira CSV
-df = pd.read_csv("apt_tickets_complete_cleaned.csv")
-
-# ✅ Combine descriptive text fields into one column
-df["text"] = (
-    df["Summary"].fillna('') + ". " +
-    df["Description"].fillna('') + ". " +
-    df["Last Comment"].fillna('') + ". " +
-    "Priority: " + df["Priority"].fillna('') + ", " +
-    "Business Priority: " + df["Business Priority"].fillna('') + ", " +
-    "Blocked Status: " + df["Blocked Status"].fillna('') + ", " +
-    "Request Status: " + df["Request Status"].fillna('') + "."
-)
-
-# ✅ Remove rows with empty text
-df = df[df["text"].str.strip() != ""]
-
-# ✅ Keep only columns we’ll need later
-df = df[["Ticket Key", "text"]]
-
-# ✅ Save cleaned version
-df.to_csv("data/jira_cleaned.csv", index=False)
-print("✅ Jira data cleaned and saved to data/jira_cleaned.csv")
-print(f"Total records after cleaning: {len(df)}")
-print("\n🧩 Sample text preview:")
-print(df["text"].head(3))
+
+def arrow_text(df, column):
+    return pc.fill_null(pc.cast(pa.array(df[column], from_pandas=True), pa.string()), "")
+
+
+def main():
+    # Load your Jira CSV (only the columns used below). The default C parser
+    # copes with quoted multi-line Description / Last Comment values; the
+    # pyarrow engine can't be told to allow newlines inside values.
+    df = pd.read_csv(
+        "apt_tickets_complete_cleaned.csv",
+        dtype_backend="pyarrow",
+        usecols=[
+            "Ticket Key", "Summary", "Description", "Last Comment",
+            "Priority", "Business Priority", "Blocked Status", "Request Status",
+        ],
+    )
+
+    # ✅ Combine descriptive text fields into one column
+    # (one Arrow kernel call instead of a chain of temporary object Series)
+    text = pc.binary_join_element_wise(
+        arrow_text(df, "Summary"), ". ",
+        arrow_text(df, "Description"), ". ",
+        arrow_text(df, "Last Comment"), ". ",
+        "Priority: ", arrow_text(df, "Priority"), ", ",
+        "Business Priority: ", arrow_text(df, "Business Priority"), ", ",
+        "Blocked Status: ", arrow_text(df, "Blocked Status"), ", ",
+        "Request Status: ", arrow_text(df, "Request Status"), ".",
+        "",  # separator
+    )
+    df["text"] = pd.arrays.ArrowExtensionArray(text)
+
+    # ✅ Remove rows with empty text
+    df = df[df["text"].str.strip() != ""]
+
+    # ✅ Keep only columns we’ll need later
+    df = df[["Ticket Key", "text"]]
+
+    # ✅ Save cleaned version
+    df.to_csv("data/jira_cleaned.csv", index=False)
+    print("✅ Jira data cleaned and saved to data/jira_cleaned.csv")
+    print(f"Total records after cleaning: {len(df)}")
+    print("\n🧩 Sample text preview:")
+    print(df["text"].head(3))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,51 +1,89 @@
 import pandas as pd
 import numpy as np
 import faiss
-from sentence_transformers import SentenceTransformer
+from rag_models import load_encoder
 import os
 
-# ────────────────────────────────────────────────
-# Step 1 — Load cleaned Jira data
-# ────────────────────────────────────────────────
-cleaned_file = "data/jira_cleaned_ready.csv"
-
-if not os.path.exists(cleaned_file):
-    raise FileNotFoundError(f"❌ Could not find {cleaned_file}. Run step5_clean_descriptions.py first.")
-
-df = pd.read_csv(cleaned_file)
-print(f"✅ Loaded {len(df)} cleaned Jira records for indexing.")
-
-# ────────────────────────────────────────────────
-# Step 2 — Load embedding model
-# ────────────────────────────────────────────────
-print("\n🔄 Loading embedding model (this may take a few seconds)...")
-model = SentenceTransformer("all-MiniLM-L6-v2")
-
-# ────────────────────────────────────────────────
-# Step 3 — Create embeddings
-# ────────────────────────────────────────────────
-print("\n🧠 Generating embeddings from cleaned ticket text...")
-embeddings = model.encode(df["Cleaned_Text"].tolist(), show_progress_bar=True)
-
-# ────────────────────────────────────────────────
-# Step 4 — Build FAISS index
-# ────────────────────────────────────────────────
-print("\n⚙️ Building FAISS index...")
-dimension = embeddings.shape[1]
-index = faiss.IndexFlatL2(dimension)
-index.add(np.array(embeddings, dtype=np.float32))
-
-# ────────────────────────────────────────────────
-# Step 5 — Save index and reference data
-# ────────────────────────────────────────────────
-os.makedirs("data", exist_ok=True)
-faiss.write_index(index, "data/jira_index.faiss")
-
-# Save a lightweight reference CSV (only what’s needed for retrieval)
-df[["Ticket Key", "Store Number", "Status", "Priority", "Business Priority", "Cleaned_Text"]].to_csv(
-    "data/jira_reference.csv", index=False
-)
-
-print("\n✅ FAISS index built and saved successfully!")
-print(f"📦 Total vectors stored: {index.ntotal}")
-print("🗂️ Saved reference file → data/jira_reference.csv")
+# Large exports are compressed with OPQ + IVF + PQ (~32 bytes per ticket
+# instead of 1.5 KB). The IVF/PQ codebooks need roughly 40 training points
+# per centroid, so smaller corpora use an HNSW graph over float16 vectors.
+PQ_MIN_VECTORS = 10_000
+
+
+def main():
+    # ────────────────────────────────────────────────
+    # Step 1 — Load cleaned Jira data
+    # ────────────────────────────────────────────────
+    cleaned_file = "data/jira_cleaned_ready.parquet"
+
+    if not os.path.exists(cleaned_file):
+        raise FileNotFoundError(f"❌ Could not find {cleaned_file}. Run step5_clean_descriptions.py first.")
+
+    df = pd.read_parquet(cleaned_file, engine="pyarrow", memory_map=True)
+    if df.empty:
+        raise ValueError(f"❌ {cleaned_file} has no tickets. Check the raw export and re-run step5_clean_descriptions.py.")
+    print(f"✅ Loaded {len(df)} cleaned Jira records for indexing.")
+
+    # ────────────────────────────────────────────────
+    # Step 2 — Load embedding model
+    # ────────────────────────────────────────────────
+    print("\n🔄 Loading embedding model (this may take a few seconds)...")
+    model = load_encoder()
+
+    # ────────────────────────────────────────────────
+    # Step 3 — Create embeddings
+    # ────────────────────────────────────────────────
+    print("\n🧠 Generating embeddings from cleaned ticket text...")
+    # Passing the whole list lets SentenceTransformer sort texts by length before
+    # batching, so each batch is padded only to similar-length neighbours.
+    embeddings = model.encode(
+        df["Cleaned_Text"].tolist(),
+        batch_size=128,
+        show_progress_bar=True,
+        convert_to_numpy=True,
+        normalize_embeddings=True,
+    )
+
+    # ────────────────────────────────────────────────
+    # Step 4 — Build FAISS index
+    # ────────────────────────────────────────────────
+    # Embeddings are unit-length, so inner product is cosine similarity
+    embeddings = np.array(embeddings, dtype=np.float32)
+    dimension = embeddings.shape[1]
+
+    if len(embeddings) >= PQ_MIN_VECTORS:
+        # ~sqrt(N) inverted lists keeps both the coarse scan and each probed list short
+        nlist = int(np.sqrt(len(embeddings)))
+        print(f"\n⚙️ Building FAISS OPQ+IVF{nlist}+PQ index...")
+        index = faiss.index_factory(dimension, f"OPQ32,IVF{nlist},PQ32x8", faiss.METRIC_INNER_PRODUCT)
+        index.train(embeddings)
+        faiss.extract_index_ivf(index).nprobe = 16  # persisted with the index
+    else:
+        print("\n⚙️ Building FAISS HNSW index (float16 storage)...")
+        index = faiss.IndexHNSWSQ(
+            dimension, faiss.ScalarQuantizer.QT_fp16, 32, faiss.METRIC_INNER_PRODUCT
+        )  # 32 graph neighbours per node
+        index.hnsw.efConstruction = 200
+        index.train(embeddings)
+
+    index.add(embeddings)
+
+    # ────────────────────────────────────────────────
+    # Step 5 — Save index and reference data
+    # ────────────────────────────────────────────────
+    os.makedirs("data", exist_ok=True)
+    faiss.write_index(index, "data/jira_index.faiss")
+
+    # Save a lightweight reference file (only what’s needed for retrieval).
+    # Row i of the Parquet file is vector id i in the index.
+    df[["Ticket Key", "Store Number", "Status", "Priority", "Business Priority", "Cleaned_Text"]].to_parquet(
+        "data/jira_reference.parquet", engine="pyarrow", index=False
+    )
+
+    print("\n✅ FAISS index built and saved successfully!")
+    print(f"📦 Total vectors stored: {index.ntotal}")
+    print("🗂️ Saved reference file → data/jira_reference.parquet")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,120 +1,348 @@
-from sentence_transformers import SentenceTransformer
-from transformers import AutoTokenizer, AutoModelForSeq2SeqLM
+from rag_models import (
+    EMBEDDING_MODEL,
+    LLM_MODEL,
+    encoder_variant,
+    generator_variant,
+    load_encoder,
+    load_generator,
+    load_index,
+    load_tokenizer,
+    release_models,
+)
+from collections import Counter
+from dataclasses import dataclass
+from functools import lru_cache
+import argparse
+import csv
+import diskcache
+import hashlib
 import pandas as pd
+import pyarrow.parquet as pq
 import numpy as np
-import faiss
+import torch
 import time
 import re
 from datetime import datetime
 import os
 
-# Allow VS Code terminal to initialize before prompting
-time.sleep(1)
-
-# ────────────────────────────────────────────────
-# Step 1 — Load FAISS index and reference data
-# ────────────────────────────────────────────────
-print("📂 Loading Jira index and data...")
-index = faiss.read_index("data/jira_index.faiss")
-df = pd.read_csv("data/jira_reference.csv")
-print(f"✅ Loaded {len(df)} Jira records.\n")
-
-# ────────────────────────────────────────────────
-# Step 2 — Load models
-# ────────────────────────────────────────────────
-print("🔄 Loading models (this may take ~15 seconds)...")
-embedder = SentenceTransformer("all-MiniLM-L6-v2")
-tokenizer = AutoTokenizer.from_pretrained("google/flan-t5-base")
-generator = AutoModelForSeq2SeqLM.from_pretrained("google/flan-t5-base")
-print("✅ Models ready!\n")
-
-# ────────────────────────────────────────────────
-# Step 3 — Get user query
-# ────────────────────────────────────────────────
-query = input("Ask your Jira analytical question: ")
-
-# ────────────────────────────────────────────────
-# Step 4 — Retrieve relevant Jira tickets
-# ────────────────────────────────────────────────
-query_vector = embedder.encode([query])
-k = 10  # Retrieve more records for better insight
-D, I = index.search(np.array(query_vector, dtype=np.float32), k)
-
-# ────────────────────────────────────────────────
-# Step 5 — Clean and build usable context
-# ────────────────────────────────────────────────
-context_parts = []
-for idx in I[0]:
-    # Use the cleaned column instead of raw "text"
-    text = str(df.iloc[idx]["Cleaned_Text"]) if "Cleaned_Text" in df.columns else str(df.iloc[idx]["text"])
+INDEX_PATH = "data/jira_index.faiss"
+REFERENCE_PATH = "data/jira_reference.parquet"
+LEGACY_REFERENCE_PATH = "data/jira_reference.csv"
+# Ticket text column, newest name first; nothing else from the reference is read
+TEXT_COLUMNS = ["Cleaned_Text", "text"]
+REPORT_PATH = "data/generated_insights.csv"
+REPORT_COLUMNS = ["timestamp", "query", "insight"]
+TOP_K = 10  # Retrieve more records for better insight
 
-    # Clean Markdown bullets, stars, and extra whitespace
-    text = re.sub(r"[*•#_\-]+", " ", text)
-    text = re.sub(r"\s{2,}", " ", text).strip()
+# On-disk cache of query embeddings (keyed by encoder variant) and generated
+# answers (keyed by generator variant, decoding settings and the exact input
+# ids), shared across runs; hit/miss counts are reported at the end of main
+CACHE_DIR = "data/.insight_cache"
+cache_stats = Counter()
+
+
+@lru_cache(maxsize=None)
+def disk_cache():
+    return diskcache.Cache(CACHE_DIR, size_limit=2**30)
 
-    # Skip if mostly numbers or too short
-    if re.fullmatch(r"[\d\W_]+", text.strip()):
-        continue
-    if len(re.findall(r"[A-Za-z]", text)) < 10:
-        continue
 
-    context_parts.append(text)
+def wait_for_terminal():
+    # Allow VS Code terminal to initialize before prompting
+    time.sleep(1)
 
-context = " ".join(context_parts)
 
-# Fallback if context is too short or numeric-heavy
-if len(context.strip()) < 100:
-    context = (
-        "Incident descriptions are brief or contain limited text. "
-        "Assume these involve hardware faults, network issues, or vendor delays "
-        "causing camera outages in retail stores."
+def load_reference(path=REFERENCE_PATH, columns=None):
+    if os.path.exists(path):
+        if columns is not None:
+            available = pq.read_schema(path).names
+            columns = [column for column in columns if column in available]
+        return pd.read_parquet(path, engine="pyarrow", columns=columns, memory_map=True)
+    # index built before the Parquet reference existed; the C parser handles
+    # quoted multi-line ticket text, which the pyarrow engine does not
+    return pd.read_csv(
+        LEGACY_REFERENCE_PATH,
+        dtype_backend="pyarrow",
+        usecols=(lambda column: column in columns) if columns is not None else None,
     )
 
-# Debug preview
-print("\n🧩 Retrieved context preview:\n")
-print(context[:800])
-print("\n───────────────────────────────────────────────\n")
-
-# ────────────────────────────────────────────────
-# Step 6 — Compose structured analytical prompt
-# ────────────────────────────────────────────────
-prompt = (
-    f"You are a senior data analyst summarizing camera-related incidents from Jira maintenance logs. "
-    f"Below are extracted ticket details:\n{context}\n\n"
-    f"Write a structured executive summary with the following sections:\n\n"
-    f"**Findings:** Summarize key recurring problems observed across the tickets.\n"
-    f"**Root Causes:** Identify likely underlying causes (e.g., hardware, network, vendor coordination).\n"
-    f"**Recommendations:** Provide 2–3 concise, actionable recommendations to prevent future incidents.\n\n"
-    f"Write in professional, clear English suitable for presentation in a Tableau dashboard or weekly IT summary."
-)
 
-# ────────────────────────────────────────────────
-# Step 7 — Generate analytical insight
-# ────────────────────────────────────────────────
-inputs = tokenizer(prompt, return_tensors="pt", truncation=True)
-outputs = generator.generate(**inputs, max_length=700, num_beams=4)
-answer = tokenizer.decode(outputs[0], skip_special_tokens=True)
-
-# ────────────────────────────────────────────────
-# Step 8 — Display result
-# ────────────────────────────────────────────────
-print("\n📊 Query:", query)
-print("\n🧠 Insight:\n", answer)
-
-# ────────────────────────────────────────────────
-# Step 9 — Optional: Save query & insight to CSV
-# ────────────────────────────────────────────────
-report_path = "data/generated_insights.csv"
-
-# Create CSV file if it doesn’t exist
-if not os.path.exists(report_path):
-    pd.DataFrame(columns=["timestamp", "query", "insight"]).to_csv(report_path, index=False)
-
-# Append the new record
-new_record = pd.DataFrame(
-    [[datetime.now().strftime("%Y-%m-%d %H:%M:%S"), query, answer]],
-    columns=["timestamp", "query", "insight"]
+@dataclass(slots=True, frozen=True)
+class RetrievalBundle:
+    distances: np.ndarray
+    indices: np.ndarray
+
+
+def embed_queries(queries):
+    """Return an (N, d) float32 matrix, encoding all uncached queries in one batch."""
+    variant = encoder_variant()
+    vectors = {}
+    missing = []
+    for text in dict.fromkeys(queries):
+        cached = disk_cache().get(("emb", EMBEDDING_MODEL, variant, text))
+        if cached is None:
+            missing.append(text)
+        else:
+            vectors[text] = np.frombuffer(cached, dtype=np.float32)
+    cache_stats["embedding hits"] += len(vectors)
+    cache_stats["embedding misses"] += len(missing)
+
+    if missing:
+        # encode() sorts a list by length internally, so batches pad to similar lengths
+        encoded = load_encoder().encode(
+            missing, batch_size=64, convert_to_numpy=True, normalize_embeddings=True, show_progress_bar=False
+        )
+        for text, vector in zip(missing, encoded):
+            vectors[text] = vector.astype(np.float32)
+            disk_cache().set(("emb", EMBEDDING_MODEL, variant, text), vectors[text].tobytes())
+    return np.ascontiguousarray(np.stack([vectors[q] for q in queries]), dtype=np.float32)
+
+
+def retrieve_batch(index, query_vectors, top_k=TOP_K):
+    """Search all queries in one FAISS call; returns one RetrievalBundle per query."""
+    distances, indices = index.search(query_vectors, top_k)
+    # Per-query rows are views into these; read-only so a consumer can't clobber another's hits
+    distances.setflags(write=False)
+    indices.setflags(write=False)
+    return [RetrievalBundle(d, i) for d, i in zip(distances, indices)]
+
+
+_BULLETS = re.compile(r"[*•#_\-]+")
+_WHITESPACE = re.compile(r"\s{2,}")
+_NON_WORDS = re.compile(r"[\d\W_]+")
+_LETTER = re.compile(r"[A-Za-z]")
+
+
+def _clean_text(text):
+    # Clean Markdown bullets, stars, and extra whitespace
+    text = _BULLETS.sub(" ", text)
+    return _WHITESPACE.sub(" ", text).strip()
+
+
+def build_context(bundle, ticket_texts):
+    """Cleaned, de-duplicated ticket texts for the prompt, most relevant first."""
+    # FAISS pads missing neighbours with -1, which would otherwise wrap to the last row
+    ids = bundle.indices[(bundle.indices >= 0) & (bundle.indices < len(ticket_texts))]
+    context_parts = []
+    seen = set()
+    for text in ticket_texts[ids]:  # one fancy-index gather for all retrieved rows
+        text = _clean_text(text)
+
+        # The same incident is often filed once per store; keep the first copy only
+        key = text[:256].lower()
+        if key in seen:
+            continue
+        seen.add(key)
+
+        # Skip if mostly numbers or too short
+        if _NON_WORDS.fullmatch(text):
+            continue
+        if len(_LETTER.findall(text)) < 10:
+            continue
+
+        context_parts.append(text)
+
+    # Fallback if context is too short or numeric-heavy
+    if len(" ".join(context_parts).strip()) < 100:
+        context_parts = [
+            "Incident descriptions are brief or contain limited text. "
+            "Assume these involve hardware faults, network issues, or vendor delays "
+            "causing camera outages in retail stores."
+        ]
+    return context_parts
+
+
+# The prompt is a fixed template around the retrieved context; the template
+# is tokenized once and only the context goes through the tokenizer per query
+PROMPT_PREFIX = (
+    "You are a senior data analyst summarizing camera-related incidents from Jira maintenance logs. "
+    "Below are extracted ticket details:\n"
+)
+PROMPT_SUFFIX = (
+    "\n\n"
+    "Write a structured executive summary with the following sections:\n\n"
+    "**Findings:** Summarize key recurring problems observed across the tickets.\n"
+    "**Root Causes:** Identify likely underlying causes (e.g., hardware, network, vendor coordination).\n"
+    "**Recommendations:** Provide 2–3 concise, actionable recommendations to prevent future incidents.\n\n"
+    "Write in professional, clear English suitable for presentation in a Tableau dashboard or weekly IT summary."
 )
-new_record.to_csv(report_path, mode="a", header=False, index=False)
 
-print(f"\n🗂️ Insight saved to: {report_path}")
+
+# Decoding settings for insights; part of the answer cache key, so changing
+# them regenerates instead of serving answers made under the old settings
+GENERATION_KWARGS = {
+    "max_new_tokens": 400,  # caps the summary itself, whatever the context length
+    "num_beams": 2,
+    "early_stopping": True,
+    "no_repeat_ngram_size": 3,
+    "length_penalty": 1.0,
+    "use_cache": True,
+}
+
+
+@lru_cache(maxsize=None)
+def template_ids():
+    tokenizer = load_tokenizer()
+    prefix_ids = tokenizer(PROMPT_PREFIX, add_special_tokens=False).input_ids
+    suffix_ids = tokenizer(PROMPT_SUFFIX, add_special_tokens=False).input_ids
+    return prefix_ids, suffix_ids
+
+
+def tokenize_prompt(tokenizer, context_parts):
+    """Token ids for the prompt, packing whole tickets into what the template leaves of the input."""
+    prefix_ids, suffix_ids = template_ids()
+    budget = tokenizer.model_max_length - len(prefix_ids) - len(suffix_ids) - 1  # room for </s>
+    context_ids = []
+    for part_ids in tokenizer(context_parts, add_special_tokens=False).input_ids:
+        # Tickets arrive most relevant first; skip any that would be cut off mid-text
+        if len(context_ids) + len(part_ids) <= budget:
+            context_ids += part_ids
+    if not context_ids:
+        # Even the best ticket overflows on its own: keep as much of it as fits
+        context_ids = tokenizer(context_parts[0], add_special_tokens=False).input_ids[:budget]
+    input_ids = torch.tensor([prefix_ids + context_ids + suffix_ids + [tokenizer.eos_token_id]])
+    return {"input_ids": input_ids, "attention_mask": torch.ones_like(input_ids)}
+
+
+def generate_answer(context_parts):
+    tokenizer = load_tokenizer()
+    inputs = tokenize_prompt(tokenizer, context_parts)
+    key = (
+        "gen",
+        LLM_MODEL,
+        generator_variant(),
+        tuple(sorted(GENERATION_KWARGS.items())),
+        hashlib.sha1(inputs["input_ids"].numpy().tobytes()).hexdigest(),
+    )
+    answer = disk_cache().get(key)
+    if answer is not None:
+        cache_stats["generation hits"] += 1
+        return answer
+    cache_stats["generation misses"] += 1
+
+    _, generator = load_generator()  # loaded on the first miss only
+    inputs = {name: ids.to(generator.device) for name, ids in inputs.items()}
+    with torch.inference_mode():
+        outputs = generator.generate(**inputs, **GENERATION_KWARGS)
+    answer = tokenizer.decode(outputs[0], skip_special_tokens=True)
+    disk_cache().set(key, answer)
+    return answer
+
+
+def release_insight_models():
+    """Free the models once a scripted batch of main() calls is done."""
+    template_ids.cache_clear()
+    release_models()
+
+
+class InsightWriter:
+    """Buffer (timestamp, query, insight) rows and append them to the report CSV in batches."""
+
+    def __init__(self, path=REPORT_PATH, buffer_size=64):
+        self.path = path
+        self.buffer_size = buffer_size
+        self._rows = []
+        self._ensure_report_file()
+
+    def _ensure_report_file(self):
+        # Create CSV file with its header if it doesn’t exist, once per writer
+        if os.path.exists(self.path):
+            return
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        with open(self.path, "w", newline="") as f:
+            csv.writer(f).writerow(REPORT_COLUMNS)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.flush()
+
+    def write(self, query, answer):
+        self._rows.append([datetime.now().strftime("%Y-%m-%d %H:%M:%S"), query, answer])
+        if len(self._rows) >= self.buffer_size:
+            self.flush()
+
+    def flush(self):
+        if not self._rows:
+            return
+        with open(self.path, "a", newline="") as f:
+            csv.writer(f).writerows(self._rows)
+        self._rows.clear()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate analytical insights from the Jira ticket index.")
+    parser.add_argument(
+        "--query", action="append", help="question to ask; repeat for several (prompted for when omitted)"
+    )
+    parser.add_argument("--top-k", type=int, default=TOP_K, help="tickets retrieved per question")
+    parser.add_argument("--nprobe", type=int, default=16, help="IVF cells searched per question (IVF indexes only)")
+    args = parser.parse_args(argv)
+
+    # ────────────────────────────────────────────────
+    # Step 1 — Load FAISS index and reference data
+    # ────────────────────────────────────────────────
+    print("📂 Loading Jira index and data...")
+    index = load_index(INDEX_PATH, nprobe=args.nprobe)
+    df = load_reference(columns=TEXT_COLUMNS)
+    # Pull the ticket text out once, nulls blanked, so retrieval indexes a plain
+    # array of str rather than df.iloc rows
+    ticket_texts = df[next(c for c in TEXT_COLUMNS if c in df.columns)].fillna("").to_numpy(dtype=object)
+    print(f"✅ Loaded {len(df)} Jira records.\n")
+
+    # ────────────────────────────────────────────────
+    # Step 2 — Get user queries
+    # ────────────────────────────────────────────────
+    if args.query:
+        queries = args.query
+    else:
+        wait_for_terminal()
+        queries = [input("Ask your Jira analytical question: ")]
+
+    # ────────────────────────────────────────────────
+    # Step 3 — Embed queries (models load lazily, on the first cache miss)
+    # ────────────────────────────────────────────────
+    query_vectors = embed_queries(queries)
+
+    # ────────────────────────────────────────────────
+    # Step 4 — Retrieve relevant Jira tickets (one batched search)
+    # ────────────────────────────────────────────────
+    bundles = retrieve_batch(index, query_vectors, args.top_k)
+
+    answers = []
+    with InsightWriter(REPORT_PATH) as writer:
+        for query, bundle in zip(queries, bundles):
+            # ────────────────────────────────────────────────
+            # Step 5 — Clean and build usable context
+            # ────────────────────────────────────────────────
+            context_parts = build_context(bundle, ticket_texts)
+
+            # Debug preview
+            print("\n🧩 Retrieved context preview:\n")
+            print(" ".join(context_parts)[:800])
+            print("\n───────────────────────────────────────────────\n")
+
+            # ────────────────────────────────────────────────
+            # Step 6 — Generate analytical insight from the structured prompt
+            # ────────────────────────────────────────────────
+            answer = generate_answer(context_parts)
+            answers.append(answer)
+
+            # ────────────────────────────────────────────────
+            # Step 7 — Display result
+            # ────────────────────────────────────────────────
+            print("\n📊 Query:", query)
+            print("\n🧠 Insight:\n", answer)
+
+            # ────────────────────────────────────────────────
+            # Step 8 — Optional: Save query & insight to CSV
+            # ────────────────────────────────────────────────
+            writer.write(query, answer)
+
+    print(f"\n🗂️ Insights saved to: {REPORT_PATH}")
+    print("💾 Cache: " + ", ".join(f"{name} {count}" for name, count in sorted(cache_stats.items())))
+    return answers
+
+
+if __name__ == "__main__":
+    main()
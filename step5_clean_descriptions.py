@@ -1,58 +1,112 @@
 import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
 import re
 import os
 
-# Load your raw Jira CSV
-df = pd.read_csv("apt_tickets_complete_cleaned.csv")
+CLEANED_PATH = "data/jira_cleaned_ready.parquet"
+OUTPUT_COLUMNS = ["Ticket Key", "Store Number", "Status", "Priority", "Business Priority", "Cleaned_Text"]
+CHUNK_ROWS = 50_000  # rows cleaned per pass; bounds peak memory
 
-def clean_text(text):
-    if pd.isna(text):
-        return ""
-    text = str(text)
 
+# (pattern, replacement) pairs applied in order, compiled once at import
+_CLEAN_RULES = [
     # Remove markdown bullets and extra symbols
-    text = re.sub(r"[*•#_\-]+", " ", text)
-    text = re.sub(r"\s{2,}", " ", text)
+    (re.compile(r"[*•#_\-]+"), " "),
+    (re.compile(r"\s{2,}"), " "),
 
     # Replace labels with natural phrasing
-    text = re.sub(r"\bIssue:?","The issue is", text, flags=re.I)
-    text = re.sub(r"\bResolution:?","The resolution was", text, flags=re.I)
-    text = re.sub(r"\bProposed Resolution:?","The proposed resolution is", text, flags=re.I)
-    text = re.sub(r"\bStatus:?","Current status:", text, flags=re.I)
+    (re.compile(r"\bIssue:?", re.I), "The issue is"),
+    (re.compile(r"\bResolution:?", re.I), "The resolution was"),
+    (re.compile(r"\bProposed Resolution:?", re.I), "The proposed resolution is"),
+    (re.compile(r"\bStatus:?", re.I), "Current status:"),
 
     # Remove URLs and email links
-    text = re.sub(r"http\S+|www\S+|\[.*?\]\(.*?\)", "", text)
-    text = re.sub(r"\[.*?\|mailto:[^\]]*\]", "", text)
+    (re.compile(r"http\S+|www\S+|\[.*?\]\(.*?\)"), ""),
+    (re.compile(r"\[.*?\|mailto:[^\]]*\]"), ""),
 
     # Remove excess punctuation, greetings, boilerplate
-    text = re.sub(r"Thank you.*", "", text, flags=re.I)
-    text = re.sub(r"Hello.*?!", "", text, flags=re.I)
+    (re.compile(r"Thank you.*", re.I), ""),
+    (re.compile(r"Hello.*?!", re.I), ""),
 
     # Normalize spacing
-    text = re.sub(r"\s{2,}", " ", text).strip()
-    return text
+    (re.compile(r"\s{2,}"), " "),
+]
+
+
+def clean_text(text):
+    if pd.isna(text):
+        return ""
+    text = str(text)
+    for pattern, replacement in _CLEAN_RULES:
+        text = pattern.sub(replacement, text)
+    return text.strip()
+
+
+def main():
+    os.makedirs("data", exist_ok=True)
+    # Written beside the real file and swapped in only once complete, so a
+    # failed run never leaves step3 a truncated (footer-less) or stale Parquet
+    partial_path = CLEANED_PATH + ".partial"
+    writer = None
+    total = 0
+    preview = None
+
+    # Stream the raw Jira CSV (only the columns used below, as Arrow-backed
+    # strings) so peak memory is one chunk, not the whole export
+    reader = pd.read_csv(
+        "apt_tickets_complete_cleaned.csv",
+        usecols=[
+            "Summary", "Description", "Last Comment", "Ticket Key",
+            "Store Number", "Status", "Priority", "Business Priority",
+        ],
+        dtype="string[pyarrow]",
+        chunksize=CHUNK_ROWS,
+    )
+    try:
+        for df in reader:
+            # Combine key columns for context
+            df["Combined_Text"] = (
+                df["Summary"].fillna('') + ". " +
+                df["Description"].fillna('') + " " +
+                df["Last Comment"].fillna('')
+            )
+
+            # Apply cleaning
+            df["Cleaned_Text"] = df["Combined_Text"].astype(object).map(clean_text)
+
+            # Drop empty rows
+            df = df[df["Cleaned_Text"].str.strip() != ""]
+
+            # Keep key fields
+            df_out = df[OUTPUT_COLUMNS]
 
-# Combine key columns for context
-df["Combined_Text"] = (
-    df["Summary"].fillna('') + ". " +
-    df["Description"].fillna('') + " " +
-    df["Last Comment"].fillna('')
-)
+            # Append to the clean file
+            table = pa.Table.from_pandas(df_out, preserve_index=False)
+            if writer is None:
+                writer = pq.ParquetWriter(partial_path, table.schema)
+            writer.write_table(table)
 
-# Apply cleaning
-df["Cleaned_Text"] = df["Combined_Text"].apply(clean_text)
+            total += len(df_out)
+            if preview is None:
+                preview = df_out.head(3)
 
-# Drop empty rows
-df = df[df["Cleaned_Text"].str.strip() != ""]
+        if writer is None:
+            # Empty export: still replace the previous output rather than keep it
+            pq.write_table(pa.table({column: pa.array([], pa.string()) for column in OUTPUT_COLUMNS}), partial_path)
+    finally:
+        if writer is not None:
+            writer.close()
+    os.replace(partial_path, CLEANED_PATH)
 
-# Keep key fields
-df_out = df[["Ticket Key", "Store Number", "Status", "Priority", "Business Priority", "Cleaned_Text"]]
+    if total == 0:
+        print(f"⚠️ No tickets left after cleaning; wrote an empty {CLEANED_PATH}")
+        return
+    print(f"✅ Cleaned Jira text saved → {CLEANED_PATH}")
+    print(f"Total cleaned tickets: {total}")
+    print("\n🧩 Sample preview:\n")
+    print(preview.to_string(index=False))
 
-# Save to clean file
-os.makedirs("data", exist_ok=True)
-df_out.to_csv("data/jira_cleaned_ready.csv", index=False)
 
-print(f"✅ Cleaned Jira text saved → data/jira_cleaned_ready.csv")
-print(f"Total cleaned tickets: {len(df_out)}")
-print("\n🧩 Sample preview:\n")
-print(df_out.head(3).to_string(index=False))
+if __name__ == "__main__":
+    main()
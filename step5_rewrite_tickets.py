@@ -1,21 +1,56 @@
 import pandas as pd
 import re
+import os
+from multiprocessing import Pool
+
+# Below this many rows, starting worker processes costs more than it saves
+PARALLEL_MIN_ROWS = 10_000
+
+_BULLETS = re.compile(r"[*•#_\-]+")
+_WHITESPACE = re.compile(r"\s{2,}")
+_BOILERPLATE = re.compile(r"(Thank you|Please provide|Hello.*?!)", re.I)
 
-df = pd.read_csv("data/jira_reference.csv")
 
 def rewrite_text(text):
     text = str(text)
-    text = re.sub(r"[*•#_\-]+", " ", text)
-    text = re.sub(r"\s{2,}", " ", text)
+    text = _BULLETS.sub(" ", text)
+    text = _WHITESPACE.sub(" ", text)
     # turn “Issue:” and “Proposed Resolution:” into plain sentences
     text = text.replace("Issue:", "The issue is")
     text = text.replace("Proposed Resolution:", "The proposed resolution is")
     text = text.replace("Status:", "Current status:")
+    # drop the bare greeting first so the boilerplate pattern below can't
+    # swallow real content up to the next "!"
     text = text.replace("Hello", "")
     # cut boilerplate like greetings or photo requests
-    text = re.sub(r"(Thank you|Please provide|Hello.*?!)", "", text, flags=re.I)
+    text = _BOILERPLATE.sub("", text)
     return text.strip()
 
-df["text"] = df["text"].apply(rewrite_text)
-df.to_csv("data/jira_reference_rewritten.csv", index=False)
-print("✅ Tickets rewritten for clearer language → data/jira_reference_rewritten.csv")
+
+def rewrite_dataframe(df, source_column="text"):
+    texts = df[source_column].tolist()
+    if len(texts) < PARALLEL_MIN_ROWS:
+        df[source_column] = [rewrite_text(text) for text in texts]
+        return df
+
+    # rewrite_text is pure and the compiled patterns are module-level, so
+    # forked workers inherit them and only the strings are pickled
+    workers = os.cpu_count() or 1
+    with Pool(workers) as pool:
+        df[source_column] = pool.map(rewrite_text, texts, chunksize=max(1, len(texts) // (workers * 8)))
+    return df
+
+
+def main():
+    if os.path.exists("data/jira_reference.parquet"):
+        df = pd.read_parquet("data/jira_reference.parquet", engine="pyarrow", memory_map=True)
+    else:
+        df = pd.read_csv("data/jira_reference.csv")
+
+    df = rewrite_dataframe(df)
+    df.to_csv("data/jira_reference_rewritten.csv", index=False)
+    print("✅ Tickets rewritten for clearer language → data/jira_reference_rewritten.csv")
+
+
+if __name__ == "__main__":
+    main()